@@ -1,17 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import random
-import networkx as nx
-from pyvis.network import Network
-import tempfile
 from io import BytesIO
-import xlsxwriter
+from collections import Counter
+from itertools import chain
 
 #############################
 # 1. MAIN APP              #
 #############################
 
+# Rows of the edges table shown in the page (the rest is in the CSV)
+MAX_PREVIEW_EDGES = 1000
+
+
 def main():
     st.title("Synthetic Social Graph Generator")
 
@@ -71,13 +72,16 @@ def main():
         0, 50000, 1000, 100
     )
 
+    # Same seed + same file + same settings => same graph (and a cache hit)
+    seed = st.number_input("Random seed", min_value=0, value=0, step=1)
+
     # Toggle for showing the network diagram (default OFF)
     show_diagram = st.checkbox("Show Network Diagram", value=False)
 
     uploaded_file = st.file_uploader("Upload Excel file", type=["xlsx", "xls"])
     if uploaded_file is not None:
         try:
-            df = pd.read_excel(uploaded_file)
+            df = read_personas_excel(uploaded_file.getvalue())
 
             required_cols = ["Name", "Handle", "Faction", "Tags", 
                              "TwHandle", "TwFollowers", "TwFollowing"]
@@ -88,8 +92,8 @@ def main():
 
             st.success("File uploaded successfully! Generating Social Graph...")
 
-            # Generate the graph
-            edges, handle_to_name, personas = generate_social_graph(
+            # Generate the graph (memoized across reruns)
+            edges_df, handle_to_name, personas = generate_social_graph_cached(
                 df,
                 hub_country_probability,
                 hub_global_probability,
@@ -97,37 +101,106 @@ def main():
                 p_inter_faction,
                 bandwagon_scale,
                 big_follow_threshold,
-                min_follow_cutoff
+                min_follow_cutoff,
+                int(seed)
             )
 
-            # Display Edges as a data frame
+            # Display Edges as a data frame (a preview only: sending every
+            # row to the browser on each rerun is slow for big graphs)
             st.write("### Final Edges (Follower -> Followed)")
-            edges_df = pd.DataFrame(edges, columns=["Follower", "Followed"])
-            st.dataframe(edges_df)
+            st.dataframe(edges_df.head(MAX_PREVIEW_EDGES))
+            if len(edges_df) > MAX_PREVIEW_EDGES:
+                st.caption(f"Showing the first {MAX_PREVIEW_EDGES:,} of {len(edges_df):,} edges.")
+            download_edges_csv_button(edges_df, filename="edges.csv")
 
             # Conditionally display the network diagram (default OFF)
             if show_diagram:
                 st.write("### Network Diagram (Nodes labeled by Name)")
-                display_network_graph(edges, handle_to_name)
+
+                # Browser-side physics freezes the tab on big graphs, so it
+                # defaults to OFF there (layout is then computed in Python)
+                enable_physics = st.checkbox(
+                    "Enable physics simulation",
+                    value=len(personas) <= MAX_PHYSICS_NODES
+                )
+                display_network_graph(edges_df, handle_to_name, enable_physics)
 
             # **NEW**: Show table of personas ranked by in-degree
-            ranking_df = build_indegree_table(personas, edges)
+            ranking_df = build_indegree_table(personas, edges_df)
             st.write("### Personas by Indegree (Incoming Connections)")
             st.dataframe(ranking_df)
             
 
             # Finally, let user download the Excel adjacency
             st.write("### Download Excel of the Network")
-            download_excel_button(personas, edges, filename="network.xlsx")
+            download_excel_button(personas, edges_df, filename="network.xlsx")
 
         except Exception as e:
             st.error(f"An error occurred: {e}")
 
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_personas_excel(file_bytes):
+    """
+    Read the uploaded persona sheet (raw bytes) into a DataFrame.
+    Memoized on the file bytes, so reruns don't re-parse the workbook.
+    Uses the Rust-based calamine engine when installed (much faster than
+    openpyxl on large sheets), else falls back to pandas' default engine.
+    """
+    try:
+        import python_calamine  # noqa: F401
+        engine = "calamine"
+    except ImportError:
+        engine = None
+
+    # Declare dtypes up front so counts arrive as ints (no object pass later)
+    return pd.read_excel(
+        BytesIO(file_bytes),
+        engine=engine,
+        dtype={"TwFollowers": "int32", "TwFollowing": "int32", "Faction": "category"}
+    )
+
+
 #############################
 # 2. GRAPH GENERATION LOGIC #
 #############################
 
+# Probabilities are stored as uint16 fixed point: p = 1.0 <=> PROB_SCALE.
+# Bandwagon can push p above 1 and a saturated V later gets p * 0.2, so
+# values up to PROB_MAX = 1 / 0.2 must survive: PROB_MAX <=> 65535
+PROB_MAX = 5.0
+PROB_SCALE = 13107
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def generate_social_graph_cached(
+    df,
+    hub_country_probability,
+    hub_global_probability,
+    p_intra_faction,
+    p_inter_faction,
+    bandwagon_scale,
+    big_follow_threshold,
+    min_follow_cutoff,
+    seed
+):
+    """
+    Memoized generate_social_graph: Streamlit reruns main() on every widget
+    change, so unchanged inputs return the previous graph immediately.
+    """
+    return generate_social_graph(
+        df,
+        hub_country_probability,
+        hub_global_probability,
+        p_intra_faction,
+        p_inter_faction,
+        bandwagon_scale,
+        big_follow_threshold,
+        min_follow_cutoff,
+        seed=seed
+    )
+
+
 def generate_social_graph(
     df, 
     hub_country_probability=0.6,
@@ -136,280 +209,442 @@ def generate_social_graph(
     p_inter_faction=0.1,
     bandwagon_scale=0.5,
     big_follow_threshold=3.0,
-    min_follow_cutoff=1000
+    min_follow_cutoff=1000,
+    seed=None
 ):
     """
     Generate a synthetic social graph.
+    A fixed seed makes the result reproducible.
 
     Returns:
-      edges:           list of (follower_handle, followed_handle)
+      edges_df:        DataFrame of edges, columns Follower / Followed (handles)
       handle_to_name:  dict handle -> Name
-      personas:        the final list of persona dicts used
+      personas:        DataFrame of the personas used (row i = persona i),
+                       with F_current / f_current counts added
     """
 
-    personas = df.to_dict("records")
-    handle_to_name = {p["Handle"]: p["Name"] for p in personas}
+    # One dedicated generator for the whole run (PCG64, bulk draws)
+    rng = np.random.default_rng(seed)
 
-    # Initialize dynamic counters
-    for person in personas:
-        person["F_desired"]  = int(person["TwFollowers"])
-        person["f_desired"]  = int(person["TwFollowing"])
-        person["F_current"]  = 0
-        person["f_current"]  = 0
-        person["tag_list"]   = str(person["Tags"]).lower().split()
+    # Persona attributes as column arrays (index = row position)
+    n = len(df)
+    handle_to_name = dict(zip(df["Handle"], df["Name"]))
+    arrays = encode_personas(df)
+    handles = arrays["handles"]
+    tw_followers = arrays["tw_followers"]
+    F_desired = arrays["F_desired"]
+    f_desired = arrays["f_desired"]
 
     # For the bandwagon effect, find max TwFollowers
-    max_desired_followers = max((p["TwFollowers"] for p in personas if p["TwFollowers"]>0), default=1)
+    max_desired_followers = tw_followers[tw_followers > 0].max(initial=1)
+
+    # 1) Base probability for every (U, V) pair: rows = U, columns = V
+    P = base_probability_matrix(
+        arrays["faction_ids"],
+        arrays["is_global_hub"],
+        arrays["hub_country_id"],
+        arrays["has_country"],
+        hub_country_probability,
+        hub_global_probability,
+        p_intra_faction,
+        p_inter_faction
+    )
 
-    random.shuffle(personas)
-    edges = []
+    # 2) Bandwagon effect (based on V)
+    P *= (1 + bandwagon_scale * tw_followers / max_desired_followers).astype(np.float32)
 
-    for U in personas:
-        possible_targets = [p for p in personas if p["Handle"] != U["Handle"]]
-        random.shuffle(possible_targets)
+    # 3) Big-Follows-Small logic: p=0 wherever U's TwFollowers exceed V's limit
+    limit = big_follow_limits(tw_followers, big_follow_threshold, min_follow_cutoff)
+    P[tw_followers[:, None] > limit[None, :]] = 0.0
 
-        while U["f_current"] < U["f_desired"] and possible_targets:
-            V = possible_targets.pop()
+    # Nobody follows themselves
+    np.fill_diagonal(P, 0.0)
 
-            # 1) Base probability
-            p = base_probability(
-                U, V,
-                hub_country_probability,
-                hub_global_probability,
-                p_intra_faction,
-                p_inter_faction
-            )
+    # Only ever compared against a uniform draw, so store as 16-bit fixed
+    # point: a quarter of the float64 matrix streamed once per follower
+    np.clip(P, 0.0, PROB_MAX, out=P)
+    P *= PROB_SCALE
+    P_q = np.rint(P, out=P).astype(np.uint16)
+    del P
 
-            # 2) Bandwagon effect (based on V)
-            bandwagon_ratio = V["TwFollowers"] / max_desired_followers
-            bandwagon_factor = 1 + bandwagon_scale * bandwagon_ratio
-            p *= bandwagon_factor
+    # 4) Sample who follows whom (array-only kernel)
+    follower_idx, followed_idx = sample_follow_edges(P_q, F_desired, f_desired, rng)
 
-            # 3) Big-Follows-Small logic
-            ratio_uf_to_vf = (U["TwFollowers"] / max(1, V["TwFollowers"])) if V["TwFollowers"]>0 else 99999
-            is_U_big = (ratio_uf_to_vf > 1.0)
+    personas = df.reset_index(drop=True)
+    personas["F_current"] = np.bincount(followed_idx, minlength=n)
+    personas["f_current"] = np.bincount(follower_idx, minlength=n)
 
-            # If ratio > threshold or V < min_follow_cutoff => p=0 if U is bigger
-            if ratio_uf_to_vf > big_follow_threshold or (V["TwFollowers"] < min_follow_cutoff and is_U_big):
-                p = 0.0
+    # Ensure min=2
+    follower_idx, followed_idx = ensure_minimum_two(n, follower_idx, followed_idx, rng)
 
-            # 4) If V is at or above desired follower count => reduce p
-            if V["F_current"] >= V["F_desired"]:
-                p *= 0.2
+    edges_df = pd.DataFrame({
+        "Follower": handles[follower_idx],
+        "Followed": handles[followed_idx]
+    })
+    return edges_df, handle_to_name, personas
 
-            # Random draw
-            if random.random() < p:
-                edges.append((U["Handle"], V["Handle"]))
-                U["f_current"] += 1
-                V["F_current"] += 1
 
-    # Ensure min=2
-    edges = ensure_minimum_two(personas, edges)
+@st.cache_data(show_spinner=False, max_entries=4)
+def encode_personas(df):
+    """
+    Turn the persona sheet into the column arrays generation works on
+    (index = row position). Memoized: it only depends on the uploaded
+    file, so slider changes skip it.
+    """
+    handles = df["Handle"].to_numpy()
+    tw_followers = df["TwFollowers"].to_numpy(dtype=float)
+    F_desired = df["TwFollowers"].to_numpy(dtype=np.int64)
+    f_desired = df["TwFollowing"].to_numpy(dtype=np.int64)
+
+    # Faction ids (NaN -> -1, which never counts as the same faction)
+    faction_ids, _ = pd.factorize(df["Faction"])
+
+    # Parse tags once, as one long Series of tags indexed by row position:
+    # '#hub' => global hub, '#hub_xxx' => country hub for 'xxx', and
+    # every '#xxx' is a country code the persona carries
+    n = len(df)
+    tags = df["Tags"].fillna("").astype(str).str.lower().str.split()
+    tags = tags.reset_index(drop=True).explode().dropna()
+    rows = tags.index.to_numpy()
+
+    is_global_hub = np.zeros(n, dtype=bool)
+    is_global_hub[rows[(tags == "#hub").to_numpy()]] = True
+
+    # A persona's country hub is its first '#hub_xxx' tag
+    hub_tags = tags[tags.str.startswith("#hub_") & (tags.str.len() > 5)]
+    hub_tags = hub_tags[~hub_tags.index.duplicated()].str[5:]
+
+    # Only countries that have a hub matter: give each an int id
+    countries = pd.Index(sorted(hub_tags.unique()))
+    hub_country_id = np.full(n, -1, dtype=np.int32)
+    hub_country_id[hub_tags.index.to_numpy()] = countries.get_indexer(hub_tags)
+
+    # has_country[i, c] => persona i is tagged '#<country c>'
+    country_id = countries.get_indexer(tags.str[1:].where(tags.str.startswith("#")))
+    has_country = np.zeros((n, len(countries)), dtype=bool)
+    has_country[rows[country_id >= 0], country_id[country_id >= 0]] = True
+
+    return {
+        "handles":        handles,
+        "tw_followers":   tw_followers,
+        "F_desired":      F_desired,
+        "f_desired":      f_desired,
+        "faction_ids":    faction_ids,
+        "is_global_hub":  is_global_hub,
+        "hub_country_id": hub_country_id,
+        "has_country":    has_country
+    }
 
-    return edges, handle_to_name, personas
 
+def sample_follow_edges(P, F_desired, f_desired, rng=None):
+    """
+    Visit each follower U in turn and sample who U follows from row P[U].
+    P holds probabilities as uint16 fixed point (p * PROB_SCALE).
+    Works on plain NumPy arrays only (no persona dicts).
 
-def base_probability(U, V, 
-                     hub_country_probability,
-                     hub_global_probability, 
-                     p_intra_faction,
-                     p_inter_faction):
+    Returns:
+      follower_idx, followed_idx:  int32 arrays, one entry per edge
     """
-    Determine the base probability that U follows V (faction/hub logic).
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = len(P)
+    F_current = np.zeros(n, dtype=np.int64)
+    f_count = np.zeros(n, dtype=np.int64)
+
+    # A row keeps at most min(quota, n) targets: preallocate for all rows
+    capacity = int(np.minimum(np.maximum(f_desired, 0), n).sum())
+    followed_idx = np.empty(capacity, dtype=np.int32)
+    k = 0
+
+    # Followers are visited in random order
+    order = rng.permutation(n)
+
+    # If V is at or above desired follower count => p *= 0.2. Kept as a
+    # per-V factor (folded with 1 / PROB_SCALE, so P[U] * saturation is
+    # the plain probability) and only touched for the V's a row just followed.
+    full, saturated = np.float32(1 / PROB_SCALE), np.float32(0.2 / PROB_SCALE)
+    saturation = np.where(F_current >= F_desired, saturated, full).astype(np.float32)
+
+    # Scratch buffers reused by every row (no per-row temporaries)
+    p = np.empty(n, dtype=np.float32)
+    draws = np.empty(n, dtype=np.float32)
+    accepted = np.empty(n, dtype=bool)
+
+    for u in order:
+        # U wants no followees: skip the row's draws entirely
+        quota = max(f_desired[u], 0)
+        if quota == 0:
+            continue
+
+        np.multiply(P[u], saturation, out=p)
+
+        # Random draw for every V at once. Visiting V in random order and
+        # stopping at f_desired is the same as keeping a random subset
+        # of the accepted targets.
+        rng.random(dtype=np.float32, out=draws)
+        np.less(draws, p, out=accepted)
+        followed = np.flatnonzero(accepted)
+        if len(followed) > quota:
+            followed = rng.choice(followed, quota, replace=False)
+
+        F_current[followed] += 1
+        saturation[followed[F_current[followed] >= F_desired[followed]]] = saturated
+        f_count[u] = len(followed)
+        followed_idx[k:k + len(followed)] = followed
+        k += len(followed)
+
+    follower_idx = np.repeat(order, f_count[order]).astype(np.int32)
+    return follower_idx, followed_idx[:k]
+
+
+def big_follow_limits(tw_followers, big_follow_threshold, min_follow_cutoff):
     """
-    hub_country_tag = find_country_hub_tag(V["tag_list"])
-    if hub_country_tag is not None:
-        if f"#{hub_country_tag}" in U["tag_list"]:
-            return hub_country_probability
-
-    if "#hub" in V["tag_list"]:
-        return hub_global_probability
+    Per-V limit on U's TwFollowers for the Big-Follows-Small rule:
+    U won't follow V if U's TwFollowers > limit[V]. Equivalent to the
+    ratio rule (U/V > threshold, or V < min_follow_cutoff and U/V > 1,
+    with U/V = 99999 when V has no followers) without an N x N ratio matrix.
+    """
+    has_followers = tw_followers > 0
+    denom = np.maximum(1, tw_followers)
+
+    # ratio > threshold
+    hard_limit = np.where(
+        has_followers,
+        big_follow_threshold * denom,
+        -np.inf if 99999 > big_follow_threshold else np.inf
+    )
 
-    if U["Faction"] == V["Faction"]:
-        return p_intra_faction
+    # V < min_follow_cutoff and ratio > 1 (U is bigger)
+    soft_limit = np.where(has_followers, denom, -np.inf)
+    soft_limit[tw_followers >= min_follow_cutoff] = np.inf
 
-    return p_inter_faction
+    return np.minimum(hard_limit, soft_limit)
 
 
-def find_country_hub_tag(tag_list):
+def base_probability_matrix(faction_ids,
+                            is_global_hub,
+                            hub_country_id,
+                            has_country,
+                            hub_country_probability,
+                            hub_global_probability,
+                            p_intra_faction,
+                            p_inter_faction):
     """
-    Look for '#hub_xxx' in V's tags. Return 'xxx' if found, else None.
+    Determine the base probability that U follows V (faction/hub logic)
+    for every pair at once. Returns an N x N array, rows = U, columns = V.
     """
-    for tag in tag_list:
-        if tag.startswith("#hub_") and len(tag) > 5:
-            return tag.split("_", 1)[1]
-    return None
+    n = len(faction_ids)
+
+    # Same faction (faction id -1 = missing, never a match)
+    same_faction = (faction_ids[:, None] == faction_ids[None, :]) & (faction_ids[:, None] >= 0)
+    P = np.full((n, n), p_inter_faction, dtype=np.float32)
+    P[same_faction] = p_intra_faction
+
+    # Global hubs (#hub)
+    P[:, is_global_hub] = hub_global_probability
+
+    # Country hubs (#hub_xxx) followed by users tagged #xxx
+    if has_country.shape[1] > 0:
+        # Country hubs are rare: only touch their columns, not all N
+        hub_cols = np.flatnonzero(hub_country_id >= 0)
+        country_match = has_country[:, hub_country_id[hub_cols]]
+        P[:, hub_cols] = np.where(country_match, np.float32(hub_country_probability), P[:, hub_cols])
+
+    return P
 
 
 #############################
 # 3. FINAL FIX LOGIC        #
 #############################
 
-def ensure_minimum_two(personas, edges):
+def ensure_minimum_two(n, follower_idx, followed_idx, rng=None):
     """
-    Ensure each persona has at least 2 followers & 2 following.
+    Ensure each of the n personas has at least 2 followers & 2 following.
+    Edges (unique pairs) are given and returned as (follower_idx,
+    followed_idx) int32 arrays, sorted by follower then followed.
     """
-    n = len(personas)
-    handle_to_index = {p["Handle"]: i for i, p in enumerate(personas)}
-
-    out_edges = [set() for _ in range(n)]
-    in_edges  = [set() for _ in range(n)]
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # Dense adjacency bitmatrix: adj[u, v] => u follows v
+    adj = np.zeros((n, n), dtype=bool)
+    adj[follower_idx, followed_idx] = True
+
+    # Adding edges never lowers anyone's degree, so a single pass over the
+    # deficient personas is enough (no fixed-point iteration needed).
+    # With fewer than 3 personas, 2 is unreachable: cap at n - 1.
+    min_degree = min(2, n - 1)
+
+    # Degrees straight from the edge arrays (O(E), no N^2 pass)
+    out_deg = np.bincount(follower_idx, minlength=n)
+    in_deg = np.bincount(followed_idx, minlength=n)
+
+    # New edges are collected here and flushed in bulk at the end
+    added_followers = []
+    added_followed = []
+
+    # Need >= 2 following: follow back a follower first, else anyone
+    for i in np.flatnonzero(out_deg < min_degree):
+        while out_deg[i] < min_degree:
+            potential_follow_backs = np.flatnonzero(adj[:, i] & ~adj[i, :])
+            if len(potential_follow_backs):
+                target = rng.choice(potential_follow_backs)
+            else:
+                # Fewer than 2 taken, so a retry almost always succeeds
+                target = rng.integers(n)
+                while target == i or adj[i, target]:
+                    target = rng.integers(n)
+            adj[i, target] = True
+            out_deg[i] += 1
+            in_deg[target] += 1
+            added_followers.append(i)
+            added_followed.append(target)
+
+    # Need >= 2 followers: someone i follows follows back first, else anyone
+    for i in np.flatnonzero(in_deg < min_degree):
+        while in_deg[i] < min_degree:
+            potential_followers = np.flatnonzero(adj[i, :] & ~adj[:, i])
+            if len(potential_followers):
+                follower = rng.choice(potential_followers)
+            else:
+                follower = rng.integers(n)
+                while follower == i or adj[follower, i]:
+                    follower = rng.integers(n)
+            adj[follower, i] = True
+            out_deg[follower] += 1
+            in_deg[i] += 1
+            added_followers.append(follower)
+            added_followed.append(i)
 
-    for (u, v) in edges:
-        if u in handle_to_index and v in handle_to_index:
-            ui = handle_to_index[u]
-            vi = handle_to_index[v]
-            out_edges[ui].add(vi)
-            in_edges[vi].add(ui)
-
-    max_tries = 1000
-    tries = 0
-
-    while tries < max_tries:
-        tries += 1
-        changed = False
-
-        for i, p in enumerate(personas):
-            f_count = len(out_edges[i])
-            F_count = len(in_edges[i])
-
-            # Need >= 2 following
-            if f_count < 2:
-                potential_follow_backs = [
-                    x for x in in_edges[i] if i not in out_edges[x]
-                ]
-                if potential_follow_backs:
-                    target = random.choice(potential_follow_backs)
-                    out_edges[i].add(target)
-                    in_edges[target].add(i)
-                    changed = True
-                else:
-                    all_indices = [idx for idx in range(n) if idx != i]
-                    random_target = random.choice(all_indices)
-                    if random_target not in out_edges[i]:
-                        out_edges[i].add(random_target)
-                        in_edges[random_target].add(i)
-                        changed = True
-
-            # Need >= 2 followers
-            if F_count < 2:
-                potential_followers = [
-                    x for x in out_edges[i] if i not in out_edges[x]
-                ]
-                if potential_followers:
-                    target = random.choice(potential_followers)
-                    out_edges[target].add(i)
-                    in_edges[i].add(target)
-                    changed = True
-                else:
-                    all_indices = [idx for idx in range(n) if idx != i]
-                    random_user = random.choice(all_indices)
-                    if i not in out_edges[random_user]:
-                        out_edges[random_user].add(i)
-                        in_edges[i].add(random_user)
-                        changed = True
-
-        if not changed:
-            break
-
-    final_edges = []
-    for ui in range(n):
-        for vi in out_edges[ui]:
-            final_edges.append((personas[ui]["Handle"], personas[vi]["Handle"]))
-    return final_edges
+    follower_idx = np.concatenate([follower_idx, added_followers]).astype(np.int32)
+    followed_idx = np.concatenate([followed_idx, added_followed]).astype(np.int32)
+    order = np.lexsort((followed_idx, follower_idx))
+    return follower_idx[order], followed_idx[order]
 
 
 #############################
 # 4. NETWORK DIAGRAM        #
 #############################
 
-def display_network_graph(edges, handle_to_name):
+# Above this many personas the physics toggle defaults to OFF
+MAX_PHYSICS_NODES = 500
+
+# Above this many nodes the static layout is random instead of
+# forceatlas2 (its cost grows with N^2 per iteration)
+MAX_LAYOUT_NODES = 500
+
+
+def display_network_graph(edges_df, handle_to_name, physics=True):
     """
     Display the network using PyVis inside Streamlit.
+    """
+    html_data = build_network_html(edges_df, handle_to_name, physics)
+    st.components.v1.html(html_data, height=1200, width=1200, scrolling=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_network_html(edges_df, handle_to_name, physics=True):
+    """
+    Build the PyVis HTML for the network (memoized: serialization is slow).
     Node size is scaled by number of incoming edges (in-degree).
     Label each node by its Name, not its Handle.
+    With physics off, node positions are computed once here instead of
+    by a force simulation in the browser.
     """
-    # Build a NetworkX graph for analysis
-    G = nx.DiGraph()
-    for (follower, followed) in edges:
-        G.add_node(follower)
-        G.add_node(followed)
-        G.add_edge(follower, followed)
+    # Imported here: only needed once the diagram is switched on
+    from pyvis.network import Network
+
+    # Nodes and in-degrees straight from the edges table (no NetworkX graph)
+    followed = edges_df["Followed"].tolist()
+    edges = list(zip(edges_df["Follower"].tolist(), followed))
+    nodes = list(dict.fromkeys(chain.from_iterable(edges)))
+    in_degs = Counter(followed)
 
     # Create a PyVis network, big height for clarity
     net = Network(height="1200px", width="100%", directed=True, bgcolor="#222222", font_color="white")
 
-    # Let the layout run, then stabilize (stop shaking):
-    net.set_options('''
-    {
-      "configure": {
-        "enabled": true,
-        "filter": ["physics"]
-      },
-      "physics": {
-        "enabled": true,
-        "solver": "repulsion",
-        "repulsion": {
-          "centralGravity": 0,
-          "springLength": 240,
-          "springConstant": 0.42,
-          "nodeDistance": 225,
-          "damping": 1
-        },
-        "maxVelocity": 50,
-        "minVelocity": 0.75,
-        "timestep": 0.28
-      }
-    }
-    ''')
-    
-
-    # Calculate in-degree and add nodes
-    in_degs = dict(G.in_degree())
-    for node in G.nodes():
-        in_degree_val = in_degs[node]
-        base_size = 10
-        scale_factor = 3
-        node_size = base_size + scale_factor * in_degree_val
-
-        name_label = handle_to_name.get(node, node)
-        tooltip_text = f"{name_label}\nFollowers (in-degree): {in_degree_val}"
-
-        net.add_node(
-            node, 
-            label=name_label,
-            size=node_size,
-            title=tooltip_text
-        )
-
-    # Add edges
-    for edge in G.edges():
-        net.add_edge(edge[0], edge[1])
+    node_positions = {}
+    if physics:
+        # Let the layout run, then stabilize (stop shaking):
+        net.set_options('''
+        {
+          "configure": {
+            "enabled": true,
+            "filter": ["physics"]
+          },
+          "physics": {
+            "enabled": true,
+            "solver": "repulsion",
+            "repulsion": {
+              "centralGravity": 0,
+              "springLength": 240,
+              "springConstant": 0.42,
+              "nodeDistance": 225,
+              "damping": 1
+            },
+            "maxVelocity": 50,
+            "minVelocity": 0.75,
+            "timestep": 0.28
+          }
+        }
+        ''')
+    else:
+        # Imported here: only needed for the static layout
+        import networkx as nx
+
+        # Static layout: positions precomputed here, no browser physics
+        net.set_options('{"physics": {"enabled": false}}')
+        G = nx.DiGraph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
+        if len(nodes) <= MAX_LAYOUT_NODES:
+            pos = nx.forceatlas2_layout(G, max_iter=50, seed=0)
+        else:
+            pos = nx.random_layout(G, seed=0)
+        pos = nx.rescale_layout_dict(pos, scale=1000)
+        node_positions = {
+            "x": [float(pos[node][0]) for node in nodes],
+            "y": [float(pos[node][1]) for node in nodes]
+        }
+
+    # Add nodes (one bulk call, parallel lists)
+    base_size = 10
+    scale_factor = 3
+    labels = [handle_to_name.get(node, node) for node in nodes]
+
+    net.add_nodes(
+        nodes,
+        label=labels,
+        size=[base_size + scale_factor * in_degs[node] for node in nodes],
+        title=[f"{label}\nFollowers (in-degree): {in_degs[node]}"
+               for node, label in zip(nodes, labels)],
+        **node_positions
+    )
 
-    # Save to HTML and display in Streamlit
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
-        net.save_graph(tmp_file.name)
-        tmp_file.seek(0)
-        html_data = tmp_file.read().decode("utf-8")
+    # Add edges straight to net.edges: add_edge checks both ends against the
+    # node-id *list* (O(N) per edge), and every end here is a node already
+    net.edges.extend({"from": a, "to": b, "arrows": "to"} for a, b in edges)
 
-    st.components.v1.html(html_data, height=1200, width=1200, scrolling=True)
+    # Render HTML in memory (no temp file round-trip)
+    return net.generate_html(notebook=False)
 
 
 #############################
 # 5. BUILD INDEGREE TABLE  #
 #############################
 
-def build_indegree_table(personas, edges):
+def build_indegree_table(personas, edges_df):
     """
     Create a sorted table of (Persona, Faction, Indegree).
     """
-    # Map each handle -> index
-    handle_to_index = {p["Handle"]: i for i, p in enumerate(personas)}
+    # Map each handle -> index (row position in personas)
+    handle_to_index = {h: i for i, h in enumerate(personas["Handle"])}
     n = len(personas)
 
     # Build in_edges
     in_edges = [set() for _ in range(n)]
-    for (u, v) in edges:
+    for (u, v) in zip(edges_df["Follower"], edges_df["Followed"]):
         if u in handle_to_index and v in handle_to_index:
             i_u = handle_to_index[u]
             i_v = handle_to_index[v]
@@ -417,9 +652,7 @@ def build_indegree_table(personas, edges):
 
     # Create table of (Persona, Faction, Indegree)
     rows = []
-    for i, p in enumerate(personas):
-        persona_name = p["Name"]
-        faction = p["Faction"]
+    for i, (persona_name, faction) in enumerate(zip(personas["Name"], personas["Faction"])):
         indeg = len(in_edges[i])
         rows.append({
             "Persona": persona_name,
@@ -432,12 +665,14 @@ def build_indegree_table(personas, edges):
     return pd.DataFrame(rows)
 
 #############################
-# 6. EXCEL EXPORT           #
+# 6. EXCEL / CSV EXPORT     #
 #############################
 
-def create_downloadable_excel(personas, edges):
+@st.cache_data(show_spinner=False, max_entries=4)
+def create_downloadable_excel(personas, edges_df):
     """
-    Creates an Excel file in memory with the format:
+    Creates an Excel file in memory (memoized: reruns that leave the graph
+    unchanged, e.g. toggling the diagram, reuse it) with the format:
       - Row 1, Col E+ => node Handles
       - Row 2, Col E+ => node Factions
       - Row 2, Col A-D => "Persona", "Handle", "Social Handle", "Faction"
@@ -445,86 +680,71 @@ def create_downloadable_excel(personas, edges):
       - Intersecting cells => 1,2,3,0 adjacency codes
     Returns the raw binary of the Excel file.
     """
-    n = len(personas)
-    handle_to_index = {}
-    index_to_handle = []
-    index_to_faction = []
-    index_to_name = []
-    index_to_tw = []
-
-    for idx, p in enumerate(personas):
-        handle_to_index[p["Handle"]] = idx
-        index_to_handle.append(p["Handle"])
-        index_to_faction.append(p["Faction"])
-        index_to_name.append(p["Name"])
-        index_to_tw.append(p.get("TwHandle", ""))
-
-    # Build out_edges array
-    out_edges = [set() for _ in range(n)]
-    for (follower, followed) in edges:
-        if follower in handle_to_index and followed in handle_to_index:
-            u = handle_to_index[follower]
-            v = handle_to_index[followed]
-            out_edges[u].add(v)
-
-    # Build code matrix
-    code = [[0]*n for _ in range(n)]
-    for i in range(n):
-        for j in range(n):
-            if i == j:
-                code[i][j] = 0
-            else:
-                ij = (j in out_edges[i])  # i->j
-                ji = (i in out_edges[j])  # j->i
-                if ij and ji:
-                    code[i][j] = 2
-                elif ij:
-                    code[i][j] = 1
-                elif ji:
-                    code[i][j] = 3
-                else:
-                    code[i][j] = 0
+    # Imported here: only needed once a sheet has been uploaded
+    import xlsxwriter
 
+    n = len(personas)
+    index_to_handle = personas["Handle"].tolist()
+    index_to_faction = personas["Faction"].tolist()
+    index_to_name = personas["Name"].tolist()
+    index_to_tw = personas["TwHandle"].tolist() if "TwHandle" in personas else [""] * n
+    handle_to_index = {h: i for i, h in enumerate(index_to_handle)}
+
+    # Edges as row indices (unknown handles are skipped)
+    u = edges_df["Follower"].map(handle_to_index)
+    v = edges_df["Followed"].map(handle_to_index)
+    known = (u.notna() & v.notna()).to_numpy()
+    u = u[known].to_numpy(dtype=np.int64)
+    v = v[known].to_numpy(dtype=np.int64)
+
+    # CSR-style neighbour lists: who i follows, and who follows i.
+    # Each sheet row is built from these when written, so the n x n
+    # code matrix never exists in memory
+    out_ptr = np.concatenate(([0], np.cumsum(np.bincount(u, minlength=n))))
+    in_ptr = np.concatenate(([0], np.cumsum(np.bincount(v, minlength=n))))
+    out_nbrs = v[np.argsort(u, kind="stable")]
+    in_nbrs = u[np.argsort(v, kind="stable")]
+
+    # Row bits: 1 = i->j, 2 = j->i, relabeled as the sheet's codes
+    # 1 = i->j only, 2 = both ways, 3 = j->i only (0 = none / diagonal)
+    code_of_bits = np.array([0, 1, 3, 2], dtype=np.uint8)
+    bits = np.zeros(n, dtype=np.uint8)
+
+    # constant_memory streams each row to disk as soon as the next one
+    # starts (no in-memory cell tree), so rows are written strictly in order
     output = BytesIO()
-    workbook = xlsxwriter.Workbook(output, {'in_memory': True})
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
     worksheet = workbook.add_worksheet("Network")
 
-    # Row 2, cols A-D => headers
-    worksheet.write(1, 0, "Persona")
-    worksheet.write(1, 1, "Handle")
-    worksheet.write(1, 2, "Social Handle")
-    worksheet.write(1, 3, "Faction")
-
     # Row 1, from col E => node handles
-    # Row 2, from col E => node factions
-    for j in range(n):
-        worksheet.write(0, 4 + j, index_to_handle[j])
-        worksheet.write(1, 4 + j, index_to_faction[j])
+    worksheet.write_row(0, 4, index_to_handle)
+
+    # Row 2, cols A-D => headers, from col E => node factions
+    worksheet.write_row(1, 0, ["Persona", "Handle", "Social Handle", "Faction"] + index_to_faction)
 
-    # Rows 3+ => each node
+    # Rows 3+ => each node: A-D => name, handle, TwHandle, faction,
+    # E+ => adjacency codes
     for i in range(n):
-        row_i = i + 2
-        # A-D => name, handle, TwHandle, faction
-        worksheet.write(row_i, 0, index_to_name[i])
-        worksheet.write(row_i, 1, index_to_handle[i])
-        worksheet.write(row_i, 2, index_to_tw[i])
-        worksheet.write(row_i, 3, index_to_faction[i])
-
-        # E+ => adjacency codes
-        for j in range(n):
-            col_j = 4 + j
-            worksheet.write(row_i, col_j, code[i][j])
+        bits[:] = 0
+        bits[out_nbrs[out_ptr[i]:out_ptr[i + 1]]] |= 1
+        bits[in_nbrs[in_ptr[i]:in_ptr[i + 1]]] |= 2
+        bits[i] = 0
+        worksheet.write_row(
+            i + 2, 0,
+            [index_to_name[i], index_to_handle[i], index_to_tw[i], index_to_faction[i]]
+            + code_of_bits[bits].tolist()
+        )
 
     workbook.close()
     output.seek(0)
     return output.getvalue()
 
 
-def download_excel_button(personas, edges, filename="network.xlsx"):
+def download_excel_button(personas, edges_df, filename="network.xlsx"):
     """
     Creates a Streamlit download button for the adjacency Excel.
     """
-    excel_data = create_downloadable_excel(personas, edges)
+    excel_data = create_downloadable_excel(personas, edges_df)
     st.download_button(
         label="Download Excel Network",
         data=excel_data,
@@ -532,8 +752,28 @@ def download_excel_button(personas, edges, filename="network.xlsx"):
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def edges_to_csv(edges_df):
+    """
+    The full edges table as CSV bytes (memoized: reruns reuse them).
+    """
+    return edges_df.to_csv(index=False).encode("utf-8")
+
+
+def download_edges_csv_button(edges_df, filename="edges.csv"):
+    """
+    Creates a Streamlit download button for the full edges table.
+    """
+    st.download_button(
+        label="Download Edges CSV",
+        data=edges_to_csv(edges_df),
+        file_name=filename,
+        mime="text/csv"
+    )
+
 #############################
-# 6. RUN THE APP            #
+# 7. RUN THE APP            #
 #############################
 
 if __name__ == "__main__":